@@ -1,3 +1,3 @@
 __version__ = "0.1.0"
 
-from envconfig.lib import process  # noqa: F401
+from envconfig.lib import process, process_many  # noqa: F401
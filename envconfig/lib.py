@@ -1,11 +1,51 @@
-import inspect
-import logging
+import functools
+import keyword
 import os
-from distutils.util import strtobool  # For casting to bool
-from typing import Any, AnyStr, Dict, get_type_hints
+import types
+import weakref
 
+# Accepted (lowercase) spellings of booleans, as in distutils.util.strtobool
+_TRUE = frozenset({"y", "yes", "t", "true", "on", "1"})
+_FALSE = frozenset({"n", "no", "f", "false", "off", "0"})
 
-def process(env: Any, raise_on_absence=True, prefix=""):
+# Data descriptors that are not config values: properties, __slots__ entries
+# and attributes of builtin types (see _is_routine)
+_DATA_DESCRIPTOR_TYPES = (
+    property,
+    types.MemberDescriptorType,
+    types.GetSetDescriptorType,
+)
+
+# Created on first use by _get_logger, so that importing envconfig doesn't
+# also import logging.
+_log = None
+
+
+def _cache_by_class(func):
+    """
+    Cache the results of `func(cls, *args)`, like `functools.lru_cache`.
+
+    The cache only holds weak references to the classes, so that classes created at
+    runtime (for example locally in a function) can still be garbage collected, along
+    with everything cached for them.
+    """
+    cache = weakref.WeakKeyDictionary()
+
+    @functools.wraps(func)
+    def wrapper(cls, *args):
+        try:
+            return cache[cls][args]
+        except KeyError:
+            pass
+        result = func(cls, *args)
+        cache.setdefault(cls, {})[args] = result
+        return result
+
+    wrapper.cache_clear = cache.clear
+    return wrapper
+
+
+def process(env: object, raise_on_absence=True, prefix="", environ=None):
     """
     Given an object that has members defined with type hints,
     load environment variables with the name of these members.
@@ -27,6 +67,12 @@ def process(env: Any, raise_on_absence=True, prefix=""):
     for the attributes of the class, if available. Otherwise, that
     attribute is set to the default if it's provided.
 
+    Attributes declared on base classes of the object's class, including those
+    that are only type hinted, are loaded the same way.
+
+    Attributes that are set on the object itself before calling `process`, for
+    example in `__init__`, are loaded as well, and their values act as defaults.
+
     Members of the class that are defined with a leading underscore, such
     as `_name`, are ignored.
 
@@ -45,20 +91,160 @@ def process(env: Any, raise_on_absence=True, prefix=""):
         For example, if an attribute `name: str` is defined, and the given prefix is `'person'`,
         then we load the environment variable `PERSON_NAME` instead of just `NAME`. Defaults to
         the empty string - i.e, no prefix.
+
+    environ: Mapping[str, str]
+        The mapping to read environment variables from, for example a snapshot
+        of the environment or a plain dict in tests. Defaults to `os.environ`.
+    """
+    env_map = os.environ if environ is None else environ
+    _get_loader(type(env), prefix, bool(raise_on_absence))(env, env_map)
+
+
+def process_many(envs, raise_on_absence=True, prefix="", environ=None):
     """
-    attributes, hints, members = _get_attributes(env)
+    Load environment variables into each of the given objects.
 
-    # Iterate over attributes, look up env, and set attribute
-    for attribute in attributes:
-        env_var = os.getenv(_get_env_var_name(prefix, attribute))
-        _process_env_var(
-            attribute=attribute,
-            env_var=env_var,
-            hints=hints,
-            members=members,
-            env=env,
-            raise_on_absence=raise_on_absence,
-        )
+    This is equivalent to calling `process` on each object with the same arguments,
+    but avoids repeating the per-call setup, which makes it cheaper when many
+    config objects are built at once.
+
+    Parameters
+    ----------
+    envs: Iterable[object]
+        The objects to load the environment into. They may be of different classes.
+
+    raise_on_absence: bool
+        See `process`.
+
+    prefix: str
+        See `process`.
+
+    environ: Mapping[str, str]
+        See `process`.
+    """
+    env_map = os.environ if environ is None else environ
+    raise_on_absence = bool(raise_on_absence)
+    cls, load = None, None
+    for env in envs:
+        # Consecutive objects are usually of the same class
+        if type(env) is not cls:
+            cls = type(env)
+            load = _get_loader(cls, prefix, raise_on_absence)
+        load(env, env_map)
+
+
+def _load_instance_attributes(env, env_map, prefix, skipped_attributes):
+    # Attributes that are only set on the instance (e.g. in __init__) can't be
+    # part of the cached class metadata, so they are looked up on every call.
+    # They always have a default: the value they were set to.
+    for attribute, value in list(vars(env).items()):
+        if attribute.startswith("_"):
+            # Remember private names, so that later instances with the same
+            # private attributes don't come through here again.
+            skipped_attributes.add(attribute)
+            continue
+        if attribute in skipped_attributes or _is_routine(value):
+            continue
+        env_var = env_map.get(_get_env_var_name(prefix, attribute))
+        if env_var:
+            caster = _get_caster(attribute, {}, {attribute: value})
+            setattr(env, attribute, caster(env_var))
+
+
+@_cache_by_class
+def _get_loader(cls: type, prefix: str, raise_on_absence: bool):
+    """
+    Generate a function that loads environment variables into an instance of `cls`.
+
+    Everything about loading a given class is known up front: its attributes, the
+    env var names, the casters and which attributes have defaults. Rather than
+    looping over that information on every call to `process`, we generate
+    straight-line code for it once per class, prefix and `raise_on_absence`.
+    For example, for the `Environment` class in `process`'s docstring:
+    ```python
+    def _load(env, env_map):
+        d = getattr(env, "__dict__", None)
+        if d and not d.keys() <= _skipped_attributes:
+            _load_instance_attributes(env, env_map, _prefix, _skipped_attributes)
+        v = env_map.get('NAME')
+        if v:
+            env.name = _cast0(v)
+        elif not hasattr(env, 'name'):
+            raise EnvconfigException('No default value provided ...')
+        v = env_map.get('AGE')
+        if v:
+            env.age = _cast1(v)
+    ```
+
+    Returns
+    -------
+    load: Callable[[object, Mapping[str, str]], None]
+        A function that takes the object to load the environment into, and the
+        mapping to read environment variables from.
+    """
+    attributes, _, members, _ = _get_class_metadata(cls)
+    namespace = {
+        "EnvconfigException": EnvconfigException,
+        "_set_absent": _set_absent,
+        "_load_instance_attributes": _load_instance_attributes,
+        "_prefix": prefix,
+        # The class's attributes, plus the private instance attributes seen
+        # so far, which _load_instance_attributes adds to
+        "_skipped_attributes": set(attributes),
+    }
+    # Attributes set only on the instance aren't in the class metadata, so
+    # they take a slower path, but only when the instance has any.
+    lines = [
+        "def _load(env, env_map):",
+        '    d = getattr(env, "__dict__", None)',
+        "    if d and not d.keys() <= _skipped_attributes:",
+        "        _load_instance_attributes(env, env_map, _prefix, _skipped_attributes)",
+    ]
+    for i, (attribute, env_var_name, caster) in enumerate(_get_fields(cls, prefix)):
+        namespace[f"_cast{i}"] = caster
+        lines.append(f"    v = env_map.get({env_var_name!r})")
+        lines.append("    if v:")
+        lines.append(f"        {_get_assignment(attribute, f'_cast{i}(v)')}")
+        # Env var is not present - check if a default is specified. Falsy
+        # defaults such as 0 or False are still defaults.
+        if attribute in members:
+            continue
+        # Without a class default, the attribute may still have been set on
+        # the instance (e.g. in __init__), which then counts as the default.
+        # No default value available - raise if that kwarg is set
+        lines.append(f"    elif not hasattr(env, {attribute!r}):")
+        if raise_on_absence:
+            message = f"No default value provided and no env var set for {attribute}"
+            lines.append(f"        raise EnvconfigException({message!r})")
+        else:
+            lines.append(f"        _set_absent(env, {attribute!r}, {env_var_name!r})")
+
+    code = compile("\n".join(lines), f"<envconfig {cls.__qualname__}>", "exec")
+    exec(code, namespace)
+    return namespace["_load"]
+
+
+def _get_assignment(attribute: str, value: str):
+    # Plain attribute stores respect properties, __slots__ and custom
+    # __setattr__, and are specialized by the interpreter, so they are also
+    # faster than writing to env.__dict__ directly (about 2x on CPython 3.11).
+    # Attribute names that can't be written as `env.name` (which shouldn't
+    # happen for attributes declared in a class body) go through setattr.
+    if attribute.isidentifier() and not keyword.iskeyword(attribute):
+        return f"env.{attribute} = {value}"
+    return f"setattr(env, {attribute!r}, {value})"
+
+
+@_cache_by_class
+def _get_fields(cls: type, prefix: str):
+    # The env var names and casters only depend on the class and the prefix,
+    # so build them once rather than on every call to process(). The names end
+    # up as constants in the generated loader, which CPython already interns.
+    attributes, _, _, casters = _get_class_metadata(cls)
+    return tuple(
+        (attribute, _get_env_var_name(prefix, attribute), casters[attribute])
+        for attribute in attributes
+    )
 
 
 def _get_env_var_name(prefix: str, attribute: str):
@@ -69,75 +255,89 @@ def _get_env_var_name(prefix: str, attribute: str):
     )
 
 
-def _get_attributes(obj: Any):
-    """
-    Get the attributes of the given object that are relevant to envconfig's usage.
+@_cache_by_class
+def _get_class_metadata(cls: type):
+    # Get the attributes of the class that are relevant to envconfig's usage:
+    # all attributes that are defined explicitly using assignment (`members`,
+    # mapping the name to the default), and all attributes that are type
+    # hinted (`hints`, mapping the name to the hint).
+    # Reflection over the class is comparatively expensive, and its result
+    # does not change between calls to process(), so cache it per class.
+    # This also picks the function used to cast each attribute's env var, so
+    # that process() doesn't have to dispatch on the type for every attribute.
+    # Callers must treat the returned dictionaries as read-only.
 
-    In particular, we get all attributes that are defined explicitly using assignment,
-    and all attributes that are only ever type-hinted, and combine these attributes
-    into a single set to return.
+    # typing is only needed here, and this only runs once per class
+    from typing import get_type_hints
 
-    Parameters
-    ----------
-    obj: Any
-        Any Python object.
+    hints = get_type_hints(cls)
+    # Read the class dictionaries directly rather than via inspect.getmembers,
+    # which calls getattr for every name (including all of object's dunders).
+    # Walk the MRO from the base classes down so that subclasses override.
+    members = {}
+    for klass in reversed(cls.__mro__):
+        for key, value in vars(klass).items():
+            # Ignore members that start with underscores, and methods
+            if not key.startswith("_") and not _is_routine(value):
+                members[key] = value
+    # Construct the union of attributes that we got from both hints
+    # and members, deduplicated but in a deterministic order
+    attributes = tuple({**members, **hints})
+    casters = {
+        attribute: _get_caster(attribute, hints, members) for attribute in attributes
+    }
+    return attributes, hints, members, casters
 
-    Returns
-    -------
-    attributes: set
-        A set of attributes (represented as strings) that are deemed to be of importance
-        for environment variable loading.
 
-    hints: Dict[AnyStr, Any]
-        A dictionary that maps the attribute name to the type hint, if provided.
+def _is_routine(value):
+    # Methods in the broad sense of inspect.isroutine, which also covers method
+    # descriptors (e.g. dict.keys when subclassing builtins) and non-data
+    # descriptors such as functools.cached_property.
+    # inspect is slow to import, so only do so once it's needed.
+    import inspect
 
-    members: Dict[AnyStr, Any]
-        A dictionary that maps the attribute name to the value, if provided.
-    """
-    hints: Dict[AnyStr, Any] = get_type_hints(obj)
-    members = inspect.getmembers(
-        obj,
-        lambda m: not inspect.isroutine(m),
+    return inspect.isroutine(value) or isinstance(value, _DATA_DESCRIPTOR_TYPES)
+
+
+def _get_caster(attribute, hints, members):
+    # Check if a type hint is available. If so, cast to that type.
+    type_ = hints.get(attribute)
+    if not type_:
+        # Otherwise, cast to the type that the attribute was initialized to
+        type_ = type(members[attribute]) if attribute in members else str
+    # bool is a special case
+    if type_ is bool:
+        return _strtobool
+    return type_
+
+
+def _set_absent(env, attribute, env_var_name):
+    _get_logger().warning(
+        "No default value provided and no env var set for %s"
+        " (env var: %s), setting value to None",
+        attribute,
+        env_var_name,
     )
-    # Ignore members that start with underscores
-    members = {key: value for (key, value) in members if not key.startswith("_")}
-    # Construct the union of attributes that we got from both hints
-    # and members
-    attributes = set(members.keys()) | set(hints.keys())
-    return attributes, hints, members
-
-
-def _process_env_var(attribute, env_var, hints, members, env, raise_on_absence):
-    if env_var:
-        # Check if a type hint is available. If so, cast to that type.
-        type_ = hints.get(attribute)
-        if type_:
-            # bool is a special case
-            if type_ is bool:
-                setattr(env, attribute, type_(strtobool(env_var)))
-            else:
-                setattr(env, attribute, type_(env_var))
-        else:
-            # Otherwise, cast to the type that the attribute was initialized to
-            type_ = type(members[attribute])
-            setattr(env, attribute, type_(env_var))
-    else:
-        # Env var is not present - check if a default is specified
-        default_val = members.get(attribute)
-        if not default_val:
-            # No default value available - raise if that kwarg is set
-            if raise_on_absence:
-                raise EnvconfigException(
-                    f"No default value provided and no env var"
-                    f" set for {attribute} (env var: {env_var})"
-                )
-            else:
-                logging.getLogger().warning(
-                    f"No default value provided and no env var"
-                    f" set for {attribute} (env var: {attribute.upper()})"
-                )
-                logging.getLogger().warning(f"Setting value to None")
-                setattr(env, attribute, None)
+    setattr(env, attribute, None)
+
+
+def _get_logger():
+    global _log
+    if _log is None:
+        import logging
+
+        _log = logging.getLogger(__name__)
+    return _log
+
+
+def _strtobool(value: str) -> bool:
+    # Replacement for distutils.util.strtobool, which is removed in Python 3.12.
+    value = value.lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    raise ValueError(f"invalid truth value {value!r}")
 
 
 class EnvconfigException(Exception):
@@ -1,11 +1,57 @@
 import os
 import unittest
+import warnings
 
-from setuptools import find_packages, setup
+from setuptools import Extension, find_packages, setup
+from setuptools.command.build_ext import build_ext
 
 import envconfig
 
 
+class BuildExt(build_ext):
+    """
+    build_ext that optimizes the Cython extension with -O3 on GCC/Clang-style compilers.
+    """
+
+    def build_extensions(self):
+        if self.compiler.compiler_type != "msvc":
+            for extension in self.extensions:
+                extension.extra_compile_args.append("-O3")
+        super().build_extensions()
+
+
+def ext_modules():
+    """
+    Optionally compile envconfig/lib.py with Cython.
+
+    Compilation is opt-in through the PYENVCONFIG_CYTHON environment variable,
+    since it requires Cython and a C toolchain. Without it (or without Cython
+    installed) the pure Python module is used as-is.
+    """
+    if os.environ.get("PYENVCONFIG_CYTHON", "") not in ("1", "true", "yes"):
+        return []
+    try:
+        from Cython.Build import cythonize
+    except ImportError:
+        warnings.warn(
+            "PYENVCONFIG_CYTHON is set but Cython is not installed,"
+            " installing the pure Python module instead"
+        )
+        return []
+
+    return cythonize(
+        [Extension("envconfig.lib", ["envconfig/lib.py"])],
+        compiler_directives={
+            "language_level": 3,
+            "boundscheck": False,
+            "wraparound": False,
+            # Keep the pure Python semantics of annotations such as `prefix: str`,
+            # which would otherwise reject str subclasses
+            "annotation_typing": False,
+        },
+    )
+
+
 def test_suite():
     test_loader = unittest.TestLoader()
     test_suite = test_loader.discover("tests/", pattern="test_*.py")
@@ -26,6 +72,8 @@ setup(
         "Programming Language :: Python :: 3",
     ],
     packages=find_packages(),
+    ext_modules=ext_modules(),
+    cmdclass={"build_ext": BuildExt},
     test_suite="setup.test_suite",
     tests_require=[
         "coverage",
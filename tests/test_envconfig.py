@@ -1,23 +1,23 @@
+import functools
+import gc
 import os
 import unittest
+import weakref
+from unittest import mock
 
 import envconfig
 from envconfig.lib import EnvconfigException
 
 
 class TestEnvconfig(unittest.TestCase):
-    def tearDown(self):
+    def setUp(self):
         """
-        Clean up env vars after each test so environment isn't polluted.
-        TODO: perhaps a better way is to pass the environment dict to
-        envconfig.process, and have it default to os.environ instead?
+        Restore os.environ after each test so environment isn't polluted,
+        including by the PERSON_* variables the prefix test sets.
         """
-        if "NAME" in os.environ:
-            del os.environ["NAME"]
-        if "AGE" in os.environ:
-            del os.environ["AGE"]
-        if "IS_MARRIED" in os.environ:
-            del os.environ["IS_MARRIED"]
+        patcher = mock.patch.dict(os.environ)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def test_process_no_overrides(self):
         os.environ["NAME"] = "Makram"
@@ -115,3 +115,257 @@ class TestEnvconfig(unittest.TestCase):
         self.assertEqual("Makram", env.name)
         self.assertEqual(28, env.age)
         self.assertFalse(env.is_married)
+
+    def test_process_same_class_twice(self):
+        os.environ["NAME"] = "Makram"
+        os.environ["AGE"] = "28"
+
+        class Environment:
+            name: str
+            age: int = 25
+
+        first = Environment()
+        envconfig.process(first)
+
+        os.environ["AGE"] = "29"
+        second = Environment()
+        envconfig.process(second)
+
+        self.assertEqual(28, first.age)
+        self.assertEqual(29, second.age)
+        self.assertEqual("Makram", second.name)
+
+    def test_process_environ_given(self):
+        os.environ["NAME"] = "Makram"
+
+        class Environment:
+            name: str
+            age: int = 25
+
+        env = Environment()
+        envconfig.process(env, environ={"NAME": "Someone", "AGE": "30"})
+
+        self.assertEqual("Someone", env.name)
+        self.assertEqual(30, env.age)
+
+    def test_process_bool_values(self):
+        class Environment:
+            is_married: bool
+
+        for value, expected in (("YES", True), ("on", True), ("0", False)):
+            env = Environment()
+            envconfig.process(env, environ={"IS_MARRIED": value})
+            self.assertIs(expected, env.is_married)
+
+        with self.assertRaises(ValueError):
+            envconfig.process(Environment(), environ={"IS_MARRIED": "maybe"})
+
+    def test_process_falsy_defaults(self):
+        class Environment:
+            age: int = 0
+            is_married: bool = False
+            name: str = ""
+
+        env = Environment()
+        envconfig.process(env, environ={})
+
+        self.assertEqual(0, env.age)
+        self.assertIs(False, env.is_married)
+        self.assertEqual("", env.name)
+
+    def test_process_inherited_attributes(self):
+        class Base:
+            name: str
+            age = 25
+
+            def greet(self):
+                return f"Hello {self.name}"
+
+            @property
+            def title(self):
+                return self.name.title()
+
+        class Environment(Base):
+            age = 30
+            is_married: bool = True
+
+        env = Environment()
+        envconfig.process(env, environ={"NAME": "makram"})
+
+        self.assertEqual("makram", env.name)
+        self.assertEqual(30, env.age)
+        self.assertTrue(env.is_married)
+        self.assertEqual("Makram", env.title)
+
+    def test_process_raise_on_absence_per_call(self):
+        class Environment:
+            name: str
+            age: int = 25
+
+        env = Environment()
+        envconfig.process(env, raise_on_absence=False, environ={})
+        self.assertIsNone(env.name)
+        self.assertEqual(25, env.age)
+
+        with self.assertRaises(EnvconfigException):
+            envconfig.process(Environment(), environ={})
+
+    def test_process_slots(self):
+        class Environment:
+            __slots__ = ("name", "age")
+            name: str
+            age: int
+
+        env = Environment()
+        envconfig.process(env, environ={"NAME": "Makram", "AGE": "28"})
+
+        self.assertEqual("Makram", env.name)
+        self.assertEqual(28, env.age)
+
+        with self.assertRaises(EnvconfigException):
+            envconfig.process(Environment(), environ={"NAME": "Makram"})
+
+    def test_process_many(self):
+        class Person:
+            name: str
+            age: int = 25
+
+        class Account:
+            is_active: bool = False
+
+        envs = [Person(), Person(), Account()]
+        envconfig.process_many(
+            envs,
+            prefix="person",
+            environ={"PERSON_NAME": "Makram", "PERSON_IS_ACTIVE": "true"},
+        )
+
+        for person in envs[:2]:
+            self.assertEqual("Makram", person.name)
+            self.assertEqual(25, person.age)
+        self.assertTrue(envs[2].is_active)
+
+    def test_process_instance_attributes(self):
+        class Environment:
+            name: str
+            is_married: bool
+
+            def __init__(self):
+                self.name = "Makram"  # instance value is the default
+                self.port = 80  # not declared on the class at all
+                self.callback = self.__init__
+
+        env = Environment()
+        envconfig.process(env, environ={"PORT": "81", "IS_MARRIED": "no"})
+
+        self.assertEqual("Makram", env.name)
+        self.assertEqual(81, env.port)
+        self.assertIs(False, env.is_married)
+
+        env = Environment()
+        envconfig.process(env, raise_on_absence=False, environ={"NAME": "Someone"})
+
+        self.assertEqual("Someone", env.name)
+        self.assertEqual(80, env.port)
+        self.assertIsNone(env.is_married)
+
+    def test_process_base_class_hints(self):
+        class Base:
+            host: str
+
+        class Environment(Base):
+            port: int = 1
+
+        with self.assertRaises(EnvconfigException):
+            envconfig.process(Environment(), environ={})
+
+        env = Environment()
+        envconfig.process(env, environ={"HOST": "localhost", "PORT": "8080"})
+
+        self.assertEqual("localhost", env.host)
+        self.assertEqual(8080, env.port)
+
+    def test_process_does_not_keep_classes_alive(self):
+        class Environment:
+            name: str
+            age: int = 25
+
+        envconfig.process(Environment(), environ={"NAME": "Makram"})
+        envconfig.process_many([Environment()], environ={"NAME": "Makram"})
+        ref = weakref.ref(Environment)
+        del Environment
+        gc.collect()
+
+        self.assertIsNone(ref())
+
+    def test_process_str_subclass_values(self):
+        class Value(str):
+            pass
+
+        class Environment:
+            name: str
+            is_married: bool
+
+        env = Environment()
+        envconfig.process(
+            env,
+            prefix=Value("person"),
+            environ={"PERSON_NAME": Value("Makram"), "PERSON_IS_MARRIED": Value("yes")},
+        )
+
+        self.assertEqual("Makram", env.name)
+        self.assertIs(True, env.is_married)
+
+    def test_process_builtin_subclass(self):
+        class Environment(dict):
+            name: str = "x"
+
+        env = Environment()
+        envconfig.process(env, environ={"NAME": "Makram", "KEYS": "k"})
+
+        self.assertEqual("Makram", env.name)
+        self.assertEqual({}, env)
+
+    @unittest.skipUnless(hasattr(functools, "cached_property"), "Python 3.8+")
+    def test_process_cached_property(self):
+        class Environment:
+            host: str = "localhost"
+
+            @functools.cached_property
+            def url(self):
+                return f"http://{self.host}"
+
+        env = Environment()
+        envconfig.process(env, environ={"HOST": "example.com", "URL": "http://x"})
+
+        self.assertEqual("http://example.com", env.url)
+
+    def test_process_bool_no_type_hint(self):
+        class Environment:
+            is_married = True
+
+            def __init__(self):
+                self.is_retired = True
+
+        env = Environment()
+        envconfig.process(env, environ={"IS_MARRIED": "false", "IS_RETIRED": "no"})
+
+        self.assertIs(False, env.is_married)
+        self.assertIs(False, env.is_retired)
+
+    def test_process_private_instance_attributes(self):
+        class Environment:
+            name: str
+
+            def __init__(self, port=None):
+                self._cache = {}
+                if port is not None:
+                    self.port = port
+
+        first = Environment()
+        envconfig.process(first, environ={"NAME": "Makram", "_CACHE": "x"})
+        second = Environment(port=80)
+        envconfig.process(second, environ={"NAME": "Makram", "PORT": "81"})
+
+        self.assertEqual({}, first._cache)
+        self.assertEqual(81, second.port)